@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+
+import sys, os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from numba.pycc import CC
+import _kernels
+
+cc = CC('bmp280_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+cc.export('compensate_temp', 'Tuple((i8, f8))(i8, i8, i8, i8)')(_kernels.compensate_temp)
+cc.export('compensate_press', 'f8(i8, i8, i8, i8, i8, i8, i8, i8, i8, i8, i8)')(_kernels.compensate_press)
+
+if __name__ == '__main__':
+    cc.compile()
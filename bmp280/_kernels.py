@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+try:
+    from numba.extending import register_jitable
+except ImportError:
+    def register_jitable(func):
+        """ Numbaが無い環境ではPython関数のまま使う
+        """
+        return func
+
+@register_jitable
+def calc_t_fine(raw_temp: int, dig_T1: int, dig_T2: int, dig_T3: int) -> int:
+    """ 温度測定値から t_fine を算出する
+    """
+    var1 = ((((raw_temp >> 3) - (dig_T1 << 1))) * (dig_T2)) >> 11
+    var2 = (((((raw_temp >> 4) - (dig_T1)) * ((raw_temp >> 4) - (dig_T1))) >> 12) * (dig_T3)) >> 14
+    return var1 + var2
+
+@register_jitable
+def temp_from_t_fine(t_fine: int) -> float:
+    """ t_fine から温度[degC]を算出する
+    """
+    temp = (t_fine * 5 + 128) >> 8
+    return float(temp / 100)
+
+def compensate_temp(raw_temp: int, dig_T1: int, dig_T2: int, dig_T3: int) -> tuple[int, float]:
+    """ 温度測定値を補正する（t_fine, 温度[degC]を返す）
+    """
+    t_fine = calc_t_fine(raw_temp, dig_T1, dig_T2, dig_T3)
+    return t_fine, temp_from_t_fine(t_fine)
+
+def compensate_press(raw_press: int, t_fine: int,
+                     dig_P1: int, dig_P2: int, dig_P3: int,
+                     dig_P4: int, dig_P5: int, dig_P6: int,
+                     dig_P7: int, dig_P8: int, dig_P9: int) -> float:
+    """ 圧力測定値を補正する（圧力[Pa]を返す）
+    """
+    var1 = t_fine - 128000
+    var1_sq = var1 * var1
+    var2 = (var1_sq * dig_P6) + ((var1 * dig_P5) << 17) + (dig_P4 << 35)
+    var1 = ((var1_sq * dig_P3) >> 8) + ((var1 * dig_P2) << 12)
+    var1 = ((((1 << 47) + var1)) * dig_P1) >> 33
+    if var1 == 0:
+        press = 0
+    else:
+        press = 1048576 - raw_press
+        press = (((press << 31) - var2) * 3125) // var1
+        press_13 = press >> 13
+        var1 = (dig_P9 * press_13 * press_13) >> 25
+        var2 = (dig_P8 * press) >> 19
+        press = ((press + var1 + var2) >> 8) + (dig_P7 << 4)
+    return float(press / 256)
+
+if __name__ == '__main__':
+    pass
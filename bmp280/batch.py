@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+import numpy as np
+from numba import njit, vectorize
+from . import _kernels
+from .bmp280 import BMP280
+
+_compensate_press = njit(cache=True)(_kernels.compensate_press)
+
+@vectorize(['int64(int64, int64, int64, int64)'], target='parallel')
+def t_fine(raw_temp, dig_T1, dig_T2, dig_T3):
+    """ 温度測定値の配列から t_fine の配列を算出する
+    """
+    return _kernels.calc_t_fine(raw_temp, dig_T1, dig_T2, dig_T3)
+
+@vectorize(['float64(int64)'], target='parallel')
+def temp_from_t_fine(t_fine):
+    """ t_fine の配列から温度[degC]の配列を算出する
+    """
+    return _kernels.temp_from_t_fine(t_fine)
+
+@vectorize(['float64(int64, int64, int64, int64)'], target='parallel')
+def compensate_temp(raw_temp, dig_T1, dig_T2, dig_T3):
+    """ 温度測定値の配列を補正する
+    """
+    return _kernels.temp_from_t_fine(_kernels.calc_t_fine(raw_temp, dig_T1, dig_T2, dig_T3))
+
+@vectorize(['float64(int64, int64, int64, int64, int64, int64, int64, int64, int64, int64, int64)'], target='parallel')
+def compensate_press(raw_press, t_fine, dig_P1, dig_P2, dig_P3, dig_P4, dig_P5, dig_P6, dig_P7, dig_P8, dig_P9):
+    """ 圧力測定値の配列を補正する
+    """
+    return _compensate_press(raw_press, t_fine, dig_P1, dig_P2, dig_P3, dig_P4, dig_P5, dig_P6, dig_P7, dig_P8, dig_P9)
+
+def compensate_arrays(bmp280: BMP280, raw_temp: np.ndarray, raw_press: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """ デバイスの調整パラメータで温度・圧力測定値の配列を補正する
+    """
+    fine = t_fine(raw_temp, bmp280.dig_T1, bmp280.dig_T2, bmp280.dig_T3)
+    temp_C = temp_from_t_fine(fine)
+    press_Pa = compensate_press(raw_press, fine,
+                                bmp280.dig_P1, bmp280.dig_P2, bmp280.dig_P3,
+                                bmp280.dig_P4, bmp280.dig_P5, bmp280.dig_P6,
+                                bmp280.dig_P7, bmp280.dig_P8, bmp280.dig_P9)
+    return temp_C, press_Pa
+
+if __name__ == '__main__':
+    pass
@@ -4,9 +4,22 @@ import sys, os
 sys.path.append(os.pardir)
 from sc18im700 import SC18IM700
 import time
+import struct
 import logging
-
-logging.basicConfig(level=logging.DEBUG, format='%(levelname)s : %(module)s : %(funcName)s : %(message)s')
+from . import _kernels
+try:
+    from .bmp280_kernels import compensate_temp as _compensate_temp
+    from .bmp280_kernels import compensate_press as _compensate_press
+except ImportError:
+    try:
+        from numba import njit
+        _compensate_temp = njit(cache=True)(_kernels.compensate_temp)
+        _compensate_press = njit(cache=True)(_kernels.compensate_press)
+    except ImportError:
+        _compensate_temp = _kernels.compensate_temp
+        _compensate_press = _kernels.compensate_press
+
+logger = logging.getLogger(__name__)
 
 BMP280_I2C_ADDR = 0x76
 
@@ -26,6 +39,9 @@ TEMP_XLSB  = 0xFC
 CHIP_ID    = 0x58
 RESET_CODE = 0xB6
 
+STATUS_MEASURING = 0x08
+STATUS_IM_UPDATE = 0x01
+
 OSRS_T_SKIPPED = 0b000
 OSRS_T_X1      = 0b001
 OSRS_T_X2      = 0b010
@@ -59,13 +75,36 @@ FILTER_4   = 0b010
 FILTER_8   = 0b011
 FILTER_16  = 0b100
 
+_CMD_CALIB  = bytes([CALIB])
+_CMD_ID     = bytes([ID])
+_CMD_STATUS = bytes([STATUS])
+_CMD_RESET  = bytes([RESET, RESET_CODE])
+_CMD_CTRL   = bytes([CTRL_MEAS])
+_CMD_CONFIG = bytes([CONFIG])
+_CMD_PRESS  = bytes([PRESS_MSB])
+_CMD_TEMP   = bytes([TEMP_MSB])
+
+_CALIB_FMT = struct.Struct('<HhhHhhhhhhhh')
+
+_STATUS_MAX_AGE = 1/1000
+
 class BMP280:
     """ 圧力センサー（BMP280）の制御ドライバ """ 
 
+    __slots__ = ('sc18', '_write', '_read',
+                 'dig_T1', 'dig_T2', 'dig_T3',
+                 'dig_P1', 'dig_P2', 'dig_P3',
+                 'dig_P4', 'dig_P5', 'dig_P6',
+                 'dig_P7', 'dig_P8', 'dig_P9',
+                 't_fine', '_last_status',
+                 '_osrs_t', '_osrs_p', '_mode')
+
     def __init__(self, sc18: SC18IM700) -> None:
         """ インスタンスを初期化する
         """
         self.sc18: SC18IM700 = sc18
+        self._write = sc18.write_i2c
+        self._read = sc18.write_read_i2c
         self.dig_T1: int = None
         self.dig_T2: int = None
         self.dig_T3: int = None
@@ -79,6 +118,10 @@ class BMP280:
         self.dig_P8: int = None
         self.dig_P9: int = None
         self.t_fine: int = None
+        self._last_status: tuple[int, float] = (0, float('-inf'))
+        self._osrs_t: int = None
+        self._osrs_p: int = None
+        self._mode: int = None
 
     def begin(self) -> None:
         """ デバイスを開始する
@@ -91,122 +134,126 @@ class BMP280:
     def read_calib(self) -> None:
         """ 調整パラメータを読み込む
         """
-        wdata = bytes([CALIB])
-        self.sc18.write_i2c(BMP280_I2C_ADDR, wdata)
-        time.sleep(10/1000)
-        rdata = self.sc18.read_i2c(BMP280_I2C_ADDR, size=24)
-        self.dig_T1 = int.from_bytes(rdata[ 0: 2], byteorder='little', signed=False)
-        self.dig_T2 = int.from_bytes(rdata[ 2: 4], byteorder='little', signed=True)
-        self.dig_T3 = int.from_bytes(rdata[ 4: 6], byteorder='little', signed=True)
-        self.dig_P1 = int.from_bytes(rdata[ 6: 8], byteorder='little', signed=False)
-        self.dig_P2 = int.from_bytes(rdata[ 8:10], byteorder='little', signed=True)
-        self.dig_P3 = int.from_bytes(rdata[10:12], byteorder='little', signed=True)
-        self.dig_P4 = int.from_bytes(rdata[12:14], byteorder='little', signed=True)
-        self.dig_P5 = int.from_bytes(rdata[14:16], byteorder='little', signed=True)
-        self.dig_P6 = int.from_bytes(rdata[16:18], byteorder='little', signed=True)
-        self.dig_P7 = int.from_bytes(rdata[18:20], byteorder='little', signed=True)
-        self.dig_P8 = int.from_bytes(rdata[20:22], byteorder='little', signed=True)
-        self.dig_P9 = int.from_bytes(rdata[22:24], byteorder='little', signed=True)
+        rdata = self._read(BMP280_I2C_ADDR, _CMD_CALIB, size=24)
+        (self.dig_T1, self.dig_T2, self.dig_T3,
+         self.dig_P1, self.dig_P2, self.dig_P3,
+         self.dig_P4, self.dig_P5, self.dig_P6,
+         self.dig_P7, self.dig_P8, self.dig_P9) = _CALIB_FMT.unpack_from(rdata)
 
     def read_id(self) -> int:
         """ チップIDを読み込む
         """
-        wdata = bytes([ID])
-        self.sc18.write_i2c(BMP280_I2C_ADDR, wdata)
-        time.sleep(10/1000)
-        rdata = self.sc18.read_i2c(BMP280_I2C_ADDR, size=1)
-        value = int.from_bytes(rdata, byteorder='big')
+        rdata = self._read(BMP280_I2C_ADDR, _CMD_ID, size=1)
+        value = rdata[0]
         return value
 
     def write_reset(self) -> None:
         """ デバイスをリセットする
         """
-        wdata = bytes([RESET]) + bytes([RESET_CODE])
-        self.sc18.write_i2c(BMP280_I2C_ADDR, wdata)
-        time.sleep(1)
+        self._write(BMP280_I2C_ADDR, _CMD_RESET)
+        self._last_status = (0, float('-inf'))
+        self._osrs_t, self._osrs_p, self._mode = OSRS_T_SKIPPED, OSRS_P_SKIPPED, SLEEP_MODE
+        time.sleep(5/1000)
+        self._wait_status(STATUS_IM_UPDATE)
+
+    def read_status_bits(self) -> int:
+        """ ステータスレジスタの値を読み込む
+        """
+        rdata = self._read(BMP280_I2C_ADDR, _CMD_STATUS, size=1)
+        value = rdata[0]
+        self._last_status = (value, time.perf_counter())
+        return value
 
     def read_status(self) -> tuple[bool, bool]:
         """ ステータスを読み込む
         """
-        wdata = bytes([STATUS])
-        self.sc18.write_i2c(BMP280_I2C_ADDR, wdata)
-        time.sleep(10/1000)
-        rdata = self.sc18.read_i2c(BMP280_I2C_ADDR, size=1)
-        value = int.from_bytes(rdata, byteorder='big')
-        measuring = bool(value & 0x08)
-        im_update = bool(value & 0x01)
+        value = self.read_status_bits()
+        measuring = bool(value & STATUS_MEASURING)
+        im_update = bool(value & STATUS_IM_UPDATE)
         return measuring, im_update
 
+    def _cached_status_bits(self) -> int:
+        """ 直前に読み込んだステータスが新しければその値を返す
+        """
+        value, timestamp = self._last_status
+        if time.perf_counter() - timestamp < _STATUS_MAX_AGE:
+            return value
+        return self.read_status_bits()
+
+    def _wait_status(self, mask: int, timeout: float = 1.0) -> None:
+        """ ステータスの指定ビットがクリアされるまで待つ
+        """
+        deadline = time.monotonic() + timeout
+        while self.read_status_bits() & mask:
+            if deadline < time.monotonic():
+                raise RuntimeError('status bit 0x%02X not cleared within %.1f s' % (mask, timeout))
+            time.sleep(5/1000)
+
     @property
     def is_measuring(self) -> bool:
         """ 測定中のとき True を返す
         """
-        measuring, im_update = self.read_status()
-        return measuring
+        return bool(self._cached_status_bits() & STATUS_MEASURING)
 
     @property
     def is_im_update(self) -> bool:
         """ NVMからデータコピー中のとき True を返す
         """
-        measuring, im_update = self.read_status()
-        return im_update
+        return bool(self._cached_status_bits() & STATUS_IM_UPDATE)
 
     def read_ctrl_meas(self) -> tuple[int, int, int]:
         """ 制御レジスタから値を読み込む
         """
-        wdata = bytes([CTRL_MEAS])
-        self.sc18.write_i2c(BMP280_I2C_ADDR, wdata)
-        time.sleep(10/1000)
-        rdata = self.sc18.read_i2c(BMP280_I2C_ADDR, size=1)
-        value = int.from_bytes(rdata, byteorder='big')
+        rdata = self._read(BMP280_I2C_ADDR, _CMD_CTRL, size=1)
+        value = rdata[0]
         osrs_t = int((value & 0xE0) >> 5)
         osrs_p = int((value & 0x1C) >> 2)
         mode   = int((value & 0x03) >> 0)
+        self._osrs_t, self._osrs_p, self._mode = osrs_t, osrs_p, mode
         return osrs_t, osrs_p, mode
 
     def write_ctrl_meas(self, osrs_t: int, osrs_p: int, mode: int) -> None:
         """ 制御レジスタへ値を書き込む
         """
-        if (osrs_t < 0) or (7 < osrs_t):
-            raise ValueError
-        if (osrs_p < 0) or (7 < osrs_p):
-            raise ValueError
-        if (mode < 0) or (3 < mode):
-            raise ValueError
-        value = int((osrs_p << 5) | (osrs_p << 2) | (mode << 0))
-        wdata = bytes([CTRL_MEAS]) + bytes([value])
-        self.sc18.write_i2c(BMP280_I2C_ADDR, wdata)
-        time.sleep(10/1000)
+        if osrs_t & ~7:
+            raise ValueError('osrs_t out of range')
+        if osrs_p & ~7:
+            raise ValueError('osrs_p out of range')
+        if mode & ~3:
+            raise ValueError('mode out of range')
+        value = int((osrs_t << 5) | (osrs_p << 2) | (mode << 0))
+        wdata = bytes((CTRL_MEAS, value))
+        self._write(BMP280_I2C_ADDR, wdata)
+        self._last_status = (0, float('-inf'))
+        self._osrs_t, self._osrs_p, self._mode = osrs_t, osrs_p, mode
+
+    def _write_mode(self, mode: int) -> None:
+        """ 現在のオーバーサンプリング設定のままモードを書き換える
+        """
+        if (self._osrs_t is None) or (self._osrs_p is None):
+            self.read_ctrl_meas()
+        self.write_ctrl_meas(self._osrs_t, self._osrs_p, mode)
 
     def sleep_mode(self) -> None:
         """ スリープモードに遷移する
         """
-        osrs_t, osrs_p, mode = self.read_ctrl_meas()
-        mode = SLEEP_MODE
-        self.write_ctrl_meas(osrs_t, osrs_p, mode)
+        self._write_mode(SLEEP_MODE)
 
     def forced_mode(self) -> None:
         """ 強制モードに遷移する
         """
-        osrs_t, osrs_p, mode = self.read_ctrl_meas()
-        mode = FORCED_MODE
-        self.write_ctrl_meas(osrs_t, osrs_p, mode)
+        self._write_mode(FORCED_MODE)
 
     def normal_mode(self) -> None:
         """ 通常モードに遷移する
         """
-        osrs_t, osrs_p, mode = self.read_ctrl_meas()
-        mode = NORMAL_MODE
-        self.write_ctrl_meas(osrs_t, osrs_p, mode)
+        self._write_mode(NORMAL_MODE)
 
     def read_config(self) -> tuple[int, int, bool]:
         """ 設定レジスタから値を読み込む
         """
-        wdata = bytes([CONFIG])
-        self.sc18.write_i2c(BMP280_I2C_ADDR, wdata)
-        time.sleep(10/1000)
-        rdata = self.sc18.read_i2c(BMP280_I2C_ADDR, size=1)
-        value = int.from_bytes(rdata, byteorder='big')
+        rdata = self._read(BMP280_I2C_ADDR, _CMD_CONFIG, size=1)
+        value = rdata[0]
         t_sb     = int((value & 0xE0) >> 5)
         filter   = int((value & 0x1C) >> 2)
         spi3w_en = int((value & 0x01) >> 0)
@@ -215,73 +262,68 @@ class BMP280:
     def write_config(self, t_sb: int, filter: int, spi3w_en: bool) -> None:
         """ 設定レジスタへ値を書き込む
         """
-        if (t_sb < 0) or (7 < t_sb):
-            raise ValueError
-        if (filter < 0) or (7 < filter):
-            raise ValueError
+        if t_sb & ~7:
+            raise ValueError('t_sb out of range')
+        if filter & ~7:
+            raise ValueError('filter out of range')
         value = int((t_sb << 5) | (filter << 2) | (int(spi3w_en) << 0))
-        wdata = bytes([CONFIG]) + bytes([value])
-        self.sc18.write_i2c(BMP280_I2C_ADDR, wdata)
-        time.sleep(10/1000)
+        wdata = bytes((CONFIG, value))
+        self._write(BMP280_I2C_ADDR, wdata)
 
     def read_press(self) -> int:
         """ 圧力の測定値を読み込む
         """
-        wdata = bytes([PRESS_MSB])
-        self.sc18.write_i2c(BMP280_I2C_ADDR, wdata)
-        time.sleep(10/1000)
-        rdata = self.sc18.read_i2c(BMP280_I2C_ADDR, size=3)
-        value = int.from_bytes(rdata, byteorder='big')
-        return int((value & 0xFFFFF0) >> 4)
+        rdata = self._read(BMP280_I2C_ADDR, _CMD_PRESS, size=3)
+        value = (rdata[0] << 16) | (rdata[1] << 8) | rdata[2]
+        return value >> 4
 
     def read_temp(self) -> int:
         """ 温度の測定値を読み込む
         """
-        wdata = bytes([TEMP_MSB])
-        self.sc18.write_i2c(BMP280_I2C_ADDR, wdata)
-        time.sleep(10/1000)
-        rdata = self.sc18.read_i2c(BMP280_I2C_ADDR, size=3)
-        value = int.from_bytes(rdata, byteorder='big')
-        return int((value & 0xFFFFF0) >> 4)
+        rdata = self._read(BMP280_I2C_ADDR, _CMD_TEMP, size=3)
+        value = (rdata[0] << 16) | (rdata[1] << 8) | rdata[2]
+        return value >> 4
+
+    def read_press_temp(self) -> tuple[int, int]:
+        """ 圧力と温度の測定値を一括で読み込む
+        """
+        rdata = self._read(BMP280_I2C_ADDR, _CMD_PRESS, size=6)
+        press = (rdata[0] << 16) | (rdata[1] << 8) | rdata[2]
+        temp  = (rdata[3] << 16) | (rdata[4] << 8) | rdata[5]
+        return press >> 4, temp >> 4
 
     def compensate_temp(self, raw_temp: int) -> float:
         """ 温度測定値を補正する
         """
-        var1 = ((((raw_temp >> 3) - (self.dig_T1 << 1))) * (self.dig_T2)) >> 11
-        var2 = (((((raw_temp >> 4) - (self.dig_T1)) * ((raw_temp >> 4) - (self.dig_T1))) >> 12) * (self.dig_T3)) >> 14
-        self.t_fine = var1 + var2
-        temp = (self.t_fine * 5 + 128) >> 8
-        return float(temp / 100)
+        self.t_fine, temp = _compensate_temp(raw_temp, self.dig_T1, self.dig_T2, self.dig_T3)
+        return temp
 
     def compensate_press(self, raw_press: int) -> float:
         """ 圧力測定値を補正する
         """
-        # raw_temp = self.read_temp()
-        # self.compensate_temp(raw_temp)
-        var1 = self.t_fine - 128000
-        var2 = var1 * var1 * self.dig_P6
-        var2 = var2 + ((var1 * self.dig_P5) << 17)
-        var2 = var2 + (self.dig_P4 << 35)
-        var1 = ((var1 * var1 * self.dig_P3) >> 8) + ((var1 * self.dig_P2) << 12)
-        var1 = ((((1 << 47) + var1)) * self.dig_P1) >> 33
-        if var1 == 0:
-            press = 0
-        else:
-            press = 1048576 - raw_press
-            press = int((((press << 31) - var2) * 3125) / var1)
-            var1 = (self.dig_P9 * (press >> 13) * (press >> 13)) >> 25
-            var2 = (self.dig_P8 * press) >> 19
-            press = ((press + var1 + var2) >> 8) + (self.dig_P7 << 4)
-        return float(press / 256)
+        return _compensate_press(raw_press, self.t_fine,
+                                 self.dig_P1, self.dig_P2, self.dig_P3,
+                                 self.dig_P4, self.dig_P5, self.dig_P6,
+                                 self.dig_P7, self.dig_P8, self.dig_P9)
 
     def get_measure_data(self) -> tuple[float, float]:
         """ 測定データを取得する
         """
-        raw_temp = self.read_temp()
-        raw_press = self.read_press()
+        raw_press, raw_temp = self.read_press_temp()
         temp_C = self.compensate_temp(raw_temp)
         press_Pa = self.compensate_press(raw_press)
         return temp_C, press_Pa
 
+    def trigger_measure(self) -> None:
+        """ 強制モードで測定を開始する（完了は待たない）
+        """
+        self.forced_mode()
+
+    def fetch_measure(self) -> tuple[float, float]:
+        """ 測定の完了を待って測定データを取得する
+        """
+        self._wait_status(STATUS_MEASURING)
+        return self.get_measure_data()
+
 if __name__ == '__main__':
     pass
@@ -5,15 +5,19 @@ sys.path.append(os.pardir)
 from sc18im700 import SC18IM700
 from bmp280 import BMP280
 import time
+import logging
 
 def main():
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s : %(module)s : %(funcName)s : %(message)s')
     with SC18IM700('COM4') as sc18:
         bmp280 = BMP280(sc18)
         bmp280.begin()
-        bmp280.normal_mode()
+        trigger = bmp280.trigger_measure
+        fetch = bmp280.fetch_measure
         try:
             while True:
-                temp_C, press_Pa = bmp280.get_measure_data()
+                trigger()
+                temp_C, press_Pa = fetch()
                 print('{:.2f} degC / {:.2f} hPa'.format(temp_C, press_Pa/100))
                 time.sleep(1)
         except KeyboardInterrupt:
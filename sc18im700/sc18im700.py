@@ -6,7 +6,7 @@ import serial
 import time
 import logging
 
-logging.basicConfig(level=logging.INFO, format='%(levelname)s : %(module)s : %(funcName)s : %(message)s')
+logger = logging.getLogger(__name__)
 
 S_CHAR = b'S'
 P_CHAR = b'P'
@@ -109,10 +109,12 @@ class SC18IM700:
         payload = bytes([i2c_read_addr, size])
         tx_data = S_CHAR + payload + P_CHAR
         self.write(tx_data)
-        logging.debug('%s', self.bytes_to_str(tx_data))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s', self.bytes_to_str(tx_data))
         time.sleep(10/1000)
         rx_data = self.read(size)
-        logging.debug('%s', self.bytes_to_str(rx_data))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s', self.bytes_to_str(rx_data))
         return rx_data
 
     def write_i2c(self, i2c_addr: int, data: bytes) -> None:
@@ -125,7 +127,29 @@ class SC18IM700:
         payload = bytes([i2c_write_addr, size]) + bytes(data)
         tx_data = S_CHAR + payload + P_CHAR
         self.write(tx_data)
-        logging.debug('%s', self.bytes_to_str(tx_data))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s', self.bytes_to_str(tx_data))
+
+    def write_read_i2c(self, i2c_addr: int, data: bytes, size: int) -> bytes:
+        """ I2Cバスへデータを書き込み、リピートスタートで続けて読み込む
+        """
+        i2c_write_addr = self.i2c_write_addr(i2c_addr)
+        i2c_read_addr = self.i2c_read_addr(i2c_addr)
+        wsize = len(data)
+        if (wsize < 0x00) or (0xFF < wsize):
+            raise ValueError
+        if (size < 0x00) or (0xFF < size):
+            raise ValueError
+        wpayload = bytes([i2c_write_addr, wsize]) + bytes(data)
+        rpayload = bytes([i2c_read_addr, size])
+        tx_data = S_CHAR + wpayload + S_CHAR + rpayload + P_CHAR
+        self.write(tx_data)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s', self.bytes_to_str(tx_data))
+        rx_data = self.read(size)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s', self.bytes_to_str(rx_data))
+        return rx_data
 
     def read_reg(self, reg_addr: bytes) -> None:
         """ 内部レジスタから値を読み込む
@@ -136,10 +160,12 @@ class SC18IM700:
         payload = bytes(reg_addr)
         tx_data = R_CHAR + payload + P_CHAR
         self.write(tx_data)
-        logging.debug('%s', self.bytes_to_str(tx_data))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s', self.bytes_to_str(tx_data))
         time.sleep(10/1000)
         rx_data = self.read(size)
-        logging.debug('%s', self.bytes_to_str(rx_data))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s', self.bytes_to_str(rx_data))
         return rx_data
 
     def write_reg(self, reg_addr: bytes, data: bytes) -> None:
@@ -148,17 +174,20 @@ class SC18IM700:
         payload = b''.join(bytes([r, d]) for r, d in zip(reg_addr, data))
         tx_data = W_CHAR + payload + P_CHAR
         self.write(tx_data)
-        logging.debug('%s', self.bytes_to_str(tx_data))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s', self.bytes_to_str(tx_data))
 
     def read_gpio(self) -> bytes:
         """ GPIOから値を読み込む
         """
         tx_data = I_CHAR + P_CHAR
         self.write(tx_data)
-        logging.debug('%s', self.bytes_to_str(tx_data))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s', self.bytes_to_str(tx_data))
         time.sleep(10/1000)
         rx_data = self.read()
-        logging.debug('%s', self.bytes_to_str(rx_data))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s', self.bytes_to_str(rx_data))
         return rx_data
 
     def write_gpio(self, data: bytes) -> None:
@@ -169,7 +198,8 @@ class SC18IM700:
         payload = data
         tx_data = O_CHAR + payload + P_CHAR
         self.write(tx_data)
-        logging.debug('%s', self.bytes_to_str(tx_data))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s', self.bytes_to_str(tx_data))
 
     @property
     def baudrate(self) -> int:
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import unittest
+from bmp280 import *
+
+class FakeSC18IM700:
+    """ レジスタマップを模擬するUSBシリアル-I2C変換 """
+
+    def __init__(self) -> None:
+        self.regs = bytearray(256)
+        self.regs[ID] = CHIP_ID
+        self.log = []
+
+    def write_i2c(self, i2c_addr: int, data: bytes) -> None:
+        self.log.append(('write', bytes(data)))
+        reg = data[0]
+        for i, d in enumerate(data[1:]):
+            self.regs[reg + i] = d
+
+    def write_read_i2c(self, i2c_addr: int, data: bytes, size: int) -> bytes:
+        self.log.append(('write_read', bytes(data), size))
+        reg = data[0]
+        return bytes(self.regs[reg:reg + size])
+
+class TestCtrlMeas(unittest.TestCase):
+    """ 制御レジスタ（ctrl_meas）の書き込みを確認する """
+
+    def setUp(self) -> None:
+        self.sc18 = FakeSC18IM700()
+        self.bmp280 = BMP280(self.sc18)
+
+    def test_write_ctrl_meas(self) -> None:
+        self.bmp280.write_ctrl_meas(OSRS_T_X2, OSRS_P_X16, FORCED_MODE)
+        self.assertEqual(self.sc18.log[-1], ('write', bytes((0xF4, 0x55))))
+
+    def test_forced_mode_after_begin(self) -> None:
+        self.bmp280.begin()
+        self.sc18.log.clear()
+        self.bmp280.forced_mode()
+        self.assertNotIn(('write_read', bytes([CTRL_MEAS]), 1), self.sc18.log)
+        self.assertEqual(self.sc18.log, [('write', bytes((CTRL_MEAS, 0x25)))])
+
+if __name__ == '__main__':
+    unittest.main()